@@ -46,9 +46,12 @@ a = Analysis(
         'uvicorn.logging',
         'uvicorn.loops',
         'uvicorn.loops.auto',
+        'uvicorn.loops.asyncio',
+        'uvicorn.loops.uvloop',
         'uvicorn.protocols',
         'uvicorn.protocols.http',
         'uvicorn.protocols.http.auto',
+        'uvicorn.protocols.http.httptools_impl',
         'uvicorn.lifespan',
         'uvicorn.lifespan.on',
         'starlette',
@@ -57,6 +60,8 @@ a = Analysis(
         'anyio',
         'anyio._backends',
         'anyio._backends._asyncio',
+        'uvloop',
+        'httptools',
 
         # Pydantic
         'pydantic',
@@ -79,7 +84,6 @@ a = Analysis(
         'pymupdf',
         'pymupdf4llm',
         'fitz',
-        'pdf2image',
         'img2table',
         'img2table.document',
         'img2table.ocr',
@@ -87,7 +91,10 @@ a = Analysis(
         # Utilities
         'multipart',
         'python_multipart',
-        'openpyxl',
+        'aiofiles',
+        'httpx',
+        'xlsxwriter',
+        'orjson',
 
         # Torch (for EasyOCR)
         'torch',
@@ -101,7 +108,7 @@ a = Analysis(
         'tkinter',
         'matplotlib',
         'scipy',
-        'pandas',  # We use openpyxl directly
+        'pandas',  # We use xlsxwriter directly
         'jupyter',
         'IPython',
         'notebook',
@@ -0,0 +1,27 @@
+#!/bin/bash
+# DocuExtract Pro - Pull Ollama Models
+# Downloads the quantized text and vision models used by the backend.
+# Override with OLLAMA_TEXT_MODEL / OLLAMA_VISION_MODEL.
+
+set -e
+
+# Colors
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m'
+
+TEXT_MODEL="${OLLAMA_TEXT_MODEL:-llama3.1:8b-instruct-q4_K_M}"
+VISION_MODEL="${OLLAMA_VISION_MODEL:-llava:7b-v1.6-mistral-q4_K_M}"
+
+if ! command -v ollama &> /dev/null; then
+    echo -e "${RED}✗ Ollama not found${NC}"
+    echo "Install from: https://ollama.ai"
+    exit 1
+fi
+
+for MODEL in "$TEXT_MODEL" "$VISION_MODEL"; do
+    echo -e "\n${YELLOW}Pulling $MODEL...${NC}"
+    ollama pull "$MODEL"
+    echo -e "${GREEN}✓ $MODEL ready${NC}"
+done
@@ -90,8 +90,7 @@ echo -e "\n${YELLOW}Next steps:${NC}"
 echo ""
 echo "1. Start Ollama and pull models:"
 echo "   ollama serve  # In a separate terminal"
-echo "   ollama pull llama3.1:latest"
-echo "   ollama pull llava:7b"
+echo "   ./scripts/pull_models.sh"
 echo ""
 echo "2. Start the development server:"
 echo "   source venv/bin/activate"
@@ -6,6 +6,7 @@ Tauri will spawn this process to run the FastAPI server.
 """
 import sys
 import os
+import multiprocessing
 
 # Ensure the src directory is in the path
 if getattr(sys, 'frozen', False):
@@ -17,18 +18,24 @@ else:
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import uvicorn
-from src.api.main import app
-from src.core.config import API_HOST, API_PORT
+from src.core.config import API_HOST, API_PORT, UVICORN_LOOP, UVICORN_HTTP
 
 
 def main():
     """Start the FastAPI server."""
+    # Imported here so spawned worker processes don't load the API module
+    from src.api.main import app
+
     print(f"Starting DocuExtract Pro backend on {API_HOST}:{API_PORT}")
 
     uvicorn.run(
         app,
         host=API_HOST,
         port=API_PORT,
+        loop=UVICORN_LOOP,
+        http=UVICORN_HTTP,
+        # Single worker: jobs and results live in process memory
+        workers=1,
         log_level="info",
         # Disable reload in production (bundled mode)
         reload=False
@@ -36,4 +43,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for ProcessPoolExecutor workers in the PyInstaller bundle
+    multiprocessing.freeze_support()
     main()
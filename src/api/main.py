@@ -3,53 +3,171 @@ DocuExtract Pro - FastAPI Backend
 REST API for document processing operations.
 """
 import os
+import time
 import uuid
+import hashlib
 import asyncio
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from contextlib import asynccontextmanager
 
+import aiofiles
+import httpx
+import orjson
 from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 
-from ..core.config import API_HOST, API_PORT, OUTPUT_DIR, TEXT_MODEL, VISION_MODEL, OLLAMA_BASE_URL
+from ..core.config import (
+    API_HOST, API_PORT, OUTPUT_DIR, TEXT_MODEL, VISION_MODEL, OLLAMA_BASE_URL,
+    OLLAMA_KEEP_ALIVE, MAX_TOKENS, UVICORN_LOOP, UVICORN_HTTP, MAX_JOBS, RESULTS_DB
+)
 from ..core.models import (
     ProcessRequest, ProcessResponse, JobStatusResponse, ExportRequest,
     ExportFormat, HealthResponse, JobStatus, ProcessingJob, ExtractionResult
 )
-from ..core.processor import DocumentProcessor
+from ..core.processor import DocumentProcessor, run_processing
+from ..core.store import JobStore, ResultStore
 from ..license.validator import LicenseValidator
 
 # =============================================================================
 # APP SETUP
 # =============================================================================
 
-# In-memory job storage (use Redis/DB for production)
-jobs: Dict[str, ProcessingJob] = {}
-results: Dict[str, ExtractionResult] = {}
+# Bounded in-memory job index; results persisted to SQLite
+results = ResultStore(RESULTS_DB)
+
+# Results of evicted jobs, deleted off the event loop by the next background task
+_evicted_results: List[str] = []
+
+
+def _drop_result(job_id: str, job: ProcessingJob):
+    """Evicting a job also schedules its stored result for deletion."""
+    _evicted_results.append(job_id)
+
+
+def _purge_evicted_results():
+    """Delete the stored results of evicted jobs (runs in a worker thread)."""
+    while _evicted_results:
+        del results[_evicted_results.pop()]
+
+
+jobs: Dict[str, ProcessingJob] = JobStore(max_size=MAX_JOBS, on_evict=_drop_result)
+
+# Content hash (+ options) -> job_id, so identical uploads reuse the earlier job
+content_cache: Dict[str, str] = JobStore(max_size=MAX_JOBS)
 
 # Processor and license validator
 processor = DocumentProcessor()
 license_validator = LicenseValidator()
 
+# Dedicated process pool for CPU-bound extraction (keeps the event loop free).
+# Workers load the OCR models lazily so idle workers don't hold copies in VRAM.
+# Always spawn (the macOS/Windows default): a forked worker would inherit this
+# process's thread pools, held locks and CUDA-backed OCR reader.
+MP_CONTEXT = multiprocessing.get_context("spawn")
+CPU_POOL = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1), mp_context=MP_CONTEXT)
+
+# Shared job progress written by worker processes: job_id -> (percent, step)
+progress_store = None
+PROGRESS_POLL_INTERVAL = 0.5
+
+# Uploads below this size are processed on a thread instead of the pool
+FAST_PATH_MAX_BYTES = 512_000
+
+# Async Ollama client (created in lifespan) and cached health probe
+ollama_client: Optional[httpx.AsyncClient] = None
+HEALTH_CACHE_TTL = 5.0
+_last_health: Optional[tuple] = None
+_last_t = 0.0
+
 # Upload directory
 UPLOAD_DIR = Path(OUTPUT_DIR) / "uploads"
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MB
+
+# Job timestamps only need second resolution: [iso_string, monotonic_time]
+_NOW_ISO = [datetime.now().isoformat(), time.monotonic()]
+
+
+def now_iso() -> str:
+    """Current time as an ISO string, refreshed at most once per second."""
+    t = time.monotonic()
+    if t - _NOW_ISO[1] > 1.0:
+        _NOW_ISO[:] = [datetime.now().isoformat(), t]
+    return _NOW_ISO[0]
+
+
+async def preload_models():
+    """Load the vision model into Ollama so the first extraction isn't a cold start."""
+    # Only the vision model is used for inference. num_ctx must match the
+    # processor's client, or Ollama reloads the runner on the first request.
+    start = time.monotonic()
+    try:
+        resp = await ollama_client.post(
+            "/api/generate",
+            json={
+                "model": VISION_MODEL,
+                "prompt": "",
+                "keep_alive": OLLAMA_KEEP_ALIVE,
+                "options": {"num_ctx": MAX_TOKENS}
+            },
+            timeout=300.0
+        )
+        resp.raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"Model preload failed for {VISION_MODEL}: {e}")
+        return
+    print(f"Model {VISION_MODEL} preloaded ({time.monotonic() - start:.1f}s)")
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson (handles NumPy scalars natively).
+
+    Only for routes without a response_model: a custom response class turns
+    off FastAPI's Pydantic direct-to-JSON serialization.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
+    global progress_store, ollama_client
+
     # Startup
     print(f"DocuExtract Pro API starting on http://{API_HOST}:{API_PORT}")
     print(f"Text Model: {TEXT_MODEL}")
     print(f"Vision Model: {VISION_MODEL}")
+    # The job index doesn't survive a restart, so earlier results are unreachable
+    await asyncio.to_thread(results.clear)
+    manager = MP_CONTEXT.Manager()
+    progress_store = manager.dict()
+    ollama_client = httpx.AsyncClient(base_url=OLLAMA_BASE_URL, timeout=2.0)
+    preload_task = asyncio.create_task(preload_models())
+    # Small uploads run in this process, so load its OCR models before the
+    # first request instead of inside it
+    warmup_task = asyncio.create_task(asyncio.to_thread(processor.warmup))
     yield
     # Shutdown
     print("DocuExtract Pro API shutting down")
+    preload_task.cancel()
+    warmup_task.cancel()
+    CPU_POOL.shutdown(wait=False, cancel_futures=True)
+    progress_store = None
+    manager.shutdown()
+    await ollama_client.aclose()
+    ollama_client = None
 
 
 app = FastAPI(
@@ -68,29 +186,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON payloads (extraction results)
+app.add_middleware(GZipMiddleware, minimum_size=4096, compresslevel=5)
+
 
 # =============================================================================
 # BACKGROUND PROCESSING
 # =============================================================================
 
-async def process_document_task(job_id: str, file_path: str, options: ProcessRequest):
+async def process_document_task(
+    job_id: str,
+    file_path: str,
+    options: ProcessRequest,
+    content_key: Optional[str] = None
+):
     """Background task for document processing."""
     job = jobs[job_id]
-
-    def progress_callback(percent: int, step: str):
-        job.progress = percent
-        job.current_step = step
+    await asyncio.to_thread(_purge_evicted_results)
 
     try:
         job.status = JobStatus.PROCESSING
-        job.started_at = datetime.now().isoformat()
+        job.started_at = now_iso()
         job.current_step = "Starting"
 
-        # Run processing in thread pool
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None,
-            lambda: processor.process_document(
+        if job.file_size < FAST_PATH_MAX_BYTES:
+            # Small documents: a thread avoids the cross-process round-trip
+            def progress_callback(percent: int, step: str):
+                job.progress = percent
+                job.current_step = step
+
+            result = await asyncio.to_thread(
+                processor.process_document,
                 file_path=file_path,
                 method=options.method,
                 extract_tables=options.extract_tables,
@@ -98,24 +224,47 @@ async def process_document_task(job_id: str, file_path: str, options: ProcessReq
                 extract_key_values=options.extract_key_values,
                 progress_callback=progress_callback
             )
-        )
-
-        # Save result
-        results[job_id] = result
-        output_path = processor.save_result(result)
+        else:
+            # Run processing in the worker pool, polling shared progress
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(
+                CPU_POOL, run_processing, file_path, options.model_dump(), progress_store, job_id
+            )
+            while not future.done():
+                await asyncio.wait({future}, timeout=PROGRESS_POLL_INTERVAL)
+                if progress_store is not None and job_id in progress_store:
+                    job.progress, job.current_step = progress_store[job_id]
+
+            result = ExtractionResult.model_validate(future.result())
+
+        # Loaders report failures as "Error: ..." text; don't let a re-upload
+        # of the same file reuse that result
+        if content_key is not None and result.text.startswith("Error:"):
+            content_cache.pop(content_key, None)
+
+        # Save result off the event loop; skip the store if the job was
+        # evicted meanwhile, since nothing could reach the row
+        if job_id in jobs:
+            await asyncio.to_thread(results.__setitem__, job_id, result)
+            if job_id not in jobs:
+                # Evicted while the write was running
+                await asyncio.to_thread(results.__delitem__, job_id)
+        output_path = await asyncio.to_thread(processor.save_result, result)
 
         job.status = JobStatus.COMPLETED
-        job.completed_at = datetime.now().isoformat()
+        job.completed_at = now_iso()
         job.progress = 100
         job.current_step = "Complete"
-        job.result = result
 
     except Exception as e:
         job.status = JobStatus.FAILED
         job.error = str(e)
-        job.completed_at = datetime.now().isoformat()
+        job.completed_at = now_iso()
 
     finally:
+        if progress_store is not None:
+            progress_store.pop(job_id, None)
+
         # Cleanup uploaded file
         try:
             os.unlink(file_path)
@@ -138,24 +287,35 @@ async def root():
     }
 
 
+async def _probe_ollama() -> tuple:
+    """Query Ollama's model list; returns (connected, text_available, vision_available)."""
+    if ollama_client is None:
+        return False, False, False
+
+    try:
+        resp = await ollama_client.get("/api/tags")
+        resp.raise_for_status()
+        models = " ".join(m.get("name", "") for m in resp.json().get("models", [])).lower()
+        return (
+            True,
+            TEXT_MODEL.split(':')[0] in models,
+            VISION_MODEL.split(':')[0] in models
+        )
+    except (httpx.HTTPError, ValueError):
+        return False, False, False
+
+
 @app.get("/api/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
     """Check API health and dependencies."""
-    import subprocess
+    global _last_health, _last_t
 
-    ollama_connected = False
-    text_model_available = False
-    vision_model_available = False
+    now = time.monotonic()
+    if _last_health is None or now - _last_t > HEALTH_CACHE_TTL:
+        _last_health = await _probe_ollama()
+        _last_t = now
 
-    try:
-        result = subprocess.run(["ollama", "list"], capture_output=True, text=True, timeout=5)
-        if result.returncode == 0:
-            ollama_connected = True
-            models = result.stdout.lower()
-            text_model_available = TEXT_MODEL.split(':')[0] in models
-            vision_model_available = VISION_MODEL.split(':')[0] in models
-    except:
-        pass
+    ollama_connected, text_model_available, vision_model_available = _last_health
 
     license_info = license_validator.get_license_info()
 
@@ -177,7 +337,8 @@ async def process_document(
     method: str = Query(default="auto", description="Processing method"),
     extract_tables: bool = Query(default=True),
     extract_signatures: bool = Query(default=True),
-    extract_key_values: bool = Query(default=True)
+    extract_key_values: bool = Query(default=True),
+    force: bool = Query(default=False, description="Reprocess even if this document was already processed")
 ):
     """
     Upload and process a document.
@@ -200,21 +361,40 @@ async def process_document(
             detail="Processing limit reached. Please upgrade your license."
         )
 
-    # Save uploaded file
+    # Stream uploaded file to disk
     job_id = str(uuid.uuid4())
     file_path = UPLOAD_DIR / f"{job_id}{file_ext}"
 
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    file_size = 0
+    hasher = hashlib.sha256()
+    async with aiofiles.open(file_path, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            file_size += len(chunk)
+            hasher.update(chunk)
+            await f.write(chunk)
+
+    # Identical document with identical options: reuse the existing job
+    content_key = (
+        f"{hasher.hexdigest()}:{method}:"
+        f"{int(extract_tables)}{int(extract_signatures)}{int(extract_key_values)}"
+    )
+    cached_job_id = None if force else content_cache.get(content_key)
+    if cached_job_id in jobs and jobs[cached_job_id].status != JobStatus.FAILED:
+        os.unlink(file_path)
+        return ProcessResponse(
+            job_id=cached_job_id,
+            status=jobs[cached_job_id].status,
+            message=f"Document '{file.filename}' already processed"
+        )
+    content_cache[content_key] = job_id
 
     # Create job
     job = ProcessingJob(
         job_id=job_id,
         status=JobStatus.PENDING,
         filename=file.filename,
-        file_size=len(content),
-        created_at=datetime.now().isoformat(),
+        file_size=file_size,
+        created_at=now_iso(),
         progress=0
     )
     jobs[job_id] = job
@@ -226,7 +406,7 @@ async def process_document(
         extract_signatures=extract_signatures,
         extract_key_values=extract_key_values
     )
-    background_tasks.add_task(process_document_task, job_id, str(file_path), options)
+    background_tasks.add_task(process_document_task, job_id, str(file_path), options, content_key)
 
     # Increment usage counter
     license_validator.record_usage()
@@ -269,19 +449,21 @@ async def get_result(job_id: str):
     if job.status == JobStatus.FAILED:
         raise HTTPException(status_code=500, detail=f"Job failed: {job.error}")
 
-    if job_id not in results:
+    # Results are stored as JSON, so serve them without a model round-trip
+    data = await asyncio.to_thread(results.get_json, job_id)
+    if data is None:
         raise HTTPException(status_code=404, detail="Result not found")
 
-    return results[job_id].model_dump()
+    return Response(content=data, media_type="application/json")
 
 
 @app.post("/api/export/{job_id}", tags=["Export"])
 async def export_result(job_id: str, export_request: ExportRequest):
     """Export extraction result to specified format."""
-    if job_id not in results:
+    result = await asyncio.to_thread(results.get, job_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Result not found")
 
-    result = results[job_id]
     source_name = Path(result.document_source).stem
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
@@ -298,26 +480,12 @@ async def export_result(job_id: str, export_request: ExportRequest):
         processor.export_to_excel(result, str(output_path))
 
     elif export_request.format == ExportFormat.MARKDOWN:
-        output_path = OUTPUT_DIR / f"{source_name}_{timestamp}.md"
-        with open(output_path, 'w') as f:
-            f.write(f"# Extraction Result: {source_name}\n\n")
-            f.write(f"**Processed:** {result.processed_at}\n\n")
-            f.write(f"## Key-Value Pairs\n\n")
-            for kv in result.key_values:
-                f.write(f"- **{kv.key}:** {kv.value}\n")
-            f.write(f"\n## Tables\n\n")
-            for table in result.tables:
-                f.write(f"### {table.id}\n\n")
-                if table.rows:
-                    headers = table.rows[0]
-                    f.write("| " + " | ".join(headers) + " |\n")
-                    f.write("| " + " | ".join(["---"] * len(headers)) + " |\n")
-                    for row in table.rows[1:]:
-                        f.write("| " + " | ".join(row) + " |\n")
-                f.write("\n")
-            f.write(f"## Signatures\n\n")
-            for sig in result.signatures:
-                f.write(f"- {sig.id}: {sig.status.value} (confidence: {sig.confidence})\n")
+        # Markdown is rendered straight into the response, no temp file
+        return Response(
+            content=processor.render_markdown(result),
+            media_type="text/markdown",
+            headers={"Content-Disposition": f'attachment; filename="{source_name}_{timestamp}.md"'}
+        )
 
     return FileResponse(
         path=str(output_path),
@@ -326,14 +494,11 @@ async def export_result(job_id: str, export_request: ExportRequest):
     )
 
 
-@app.get("/api/jobs", tags=["Processing"])
+@app.get("/api/jobs", response_class=ORJSONResponse, tags=["Processing"])
 async def list_jobs(limit: int = Query(default=50, le=100)):
     """List recent processing jobs."""
-    sorted_jobs = sorted(
-        jobs.values(),
-        key=lambda j: j.created_at,
-        reverse=True
-    )[:limit]
+    # Jobs are kept in creation order, so the newest are at the end
+    recent_jobs = itertools.islice(reversed(jobs.values()), limit)
 
     return [
         {
@@ -344,7 +509,7 @@ async def list_jobs(limit: int = Query(default=50, le=100)):
             "created_at": j.created_at,
             "completed_at": j.completed_at
         }
-        for j in sorted_jobs
+        for j in recent_jobs
     ]
 
 
@@ -353,8 +518,7 @@ async def delete_job(job_id: str):
     """Delete a job and its results."""
     if job_id in jobs:
         del jobs[job_id]
-    if job_id in results:
-        del results[job_id]
+    await asyncio.to_thread(results.__delitem__, job_id)
 
     return {"message": "Job deleted"}
 
@@ -387,7 +551,14 @@ async def activate_license(license_key: str):
 def run_server():
     """Run the API server."""
     import uvicorn
-    uvicorn.run(app, host=API_HOST, port=API_PORT)
+    uvicorn.run(
+        app,
+        host=API_HOST,
+        port=API_PORT,
+        loop=UVICORN_LOOP,
+        http=UVICORN_HTTP,
+        workers=1
+    )
 
 
 if __name__ == "__main__":
@@ -2,27 +2,45 @@
 DocuExtract Pro - Configuration
 """
 import os
+import sys
 from pathlib import Path
 
 # Model Configuration
-TEXT_MODEL = os.environ.get("OLLAMA_TEXT_MODEL", "llama3.1:latest")
-VISION_MODEL = os.environ.get("OLLAMA_VISION_MODEL", "llava:7b")
+# Q4_K_M quantizations: roughly half the weight bytes of fp16 for faster decode.
+# Override with OLLAMA_TEXT_MODEL / OLLAMA_VISION_MODEL.
+TEXT_MODEL = os.environ.get("OLLAMA_TEXT_MODEL", "llama3.1:8b-instruct-q4_K_M")
+VISION_MODEL = os.environ.get("OLLAMA_VISION_MODEL", "llava:7b-v1.6-mistral-q4_K_M")
 OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+# Concurrent requests sent to Ollama (match the server's OLLAMA_NUM_PARALLEL)
+OLLAMA_NUM_PARALLEL = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+# How long Ollama keeps models loaded after the startup warm-up
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "1h")
 
 # Processing limits
-MAX_TOKENS = int(os.environ.get("MAX_TOKENS", "4096"))
+MAX_TOKENS = int(os.environ.get("MAX_TOKENS", "4096"))  # Model context window (num_ctx)
+MAX_OUTPUT_TOKENS = int(os.environ.get("MAX_OUTPUT_TOKENS", "2048"))  # Per-response cap (num_predict)
 DOC_TEXT_LIMIT = int(os.environ.get("DOC_TEXT_LIMIT", "30000"))
 SIGNATURE_CONFIDENCE_THRESHOLD = float(os.environ.get("SIGNATURE_CONFIDENCE_THRESHOLD", "0.6"))
+# Pages analyzed concurrently per process (bounded so GPU OCR doesn't oversubscribe VRAM)
+PAGE_WORKERS = int(os.environ.get("PAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
 
 # Paths
 BASE_DIR = Path(__file__).parent.parent.parent
 OUTPUT_DIR = Path(os.environ.get("OUTPUT_DIR", str(BASE_DIR / "output")))
 OUTPUT_DIR.mkdir(exist_ok=True)
+RESULTS_DB = Path(os.environ.get("RESULTS_DB", str(OUTPUT_DIR / "results.db")))
+
+# Job storage
+MAX_JOBS = int(os.environ.get("MAX_JOBS", "500"))
 
 # API Configuration
 API_HOST = os.environ.get("API_HOST", "127.0.0.1")
 API_PORT = int(os.environ.get("API_PORT", "8000"))
 
+# Server runtime (uvloop is not available on Windows)
+UVICORN_LOOP = "uvloop" if sys.platform != "win32" else "asyncio"
+UVICORN_HTTP = "httptools"
+
 # License Configuration
 LICENSE_PUBLIC_KEY = """-----BEGIN PUBLIC KEY-----
 MIIBIjANBgkqhkiG9w0BAQEFAAOCAQ8AMIIBCgKCAQEA2Z3qX2BTLS4e...
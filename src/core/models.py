@@ -74,7 +74,7 @@ class ExtractionResult(BaseModel):
 
     # Extracted content
     text: str = Field(description="Full extracted document text")
-    text_by_page: Optional[List[str]] = Field(default=None, description="Text split by page")
+    text_by_page: Optional[List[str]] = Field(default=None, description="Text split by page, capped like text")
     key_values: List[KeyValuePair] = Field(default_factory=list)
     tables: List[TableData] = Field(default_factory=list)
     signatures: List[SignatureResult] = Field(default_factory=list)
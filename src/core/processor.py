@@ -3,13 +3,16 @@ DocuExtract Pro - Document Processing Engine
 Core extraction logic for text, tables, signatures, and key-value pairs.
 """
 import os
-import json
+import io
+import gc
 import base64
-import tempfile
 import re
 import time
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Callable
+from typing import Optional, Dict, Any, List, Callable, Iterable, Iterator, Union
 from datetime import datetime
 
 import cv2
@@ -20,8 +23,9 @@ from langchain_ollama import ChatOllama
 from langchain_core.messages import HumanMessage
 
 from .config import (
-    TEXT_MODEL, VISION_MODEL, OLLAMA_BASE_URL,
-    MAX_TOKENS, DOC_TEXT_LIMIT, SIGNATURE_CONFIDENCE_THRESHOLD, OUTPUT_DIR
+    TEXT_MODEL, VISION_MODEL, OLLAMA_BASE_URL, OLLAMA_NUM_PARALLEL,
+    MAX_TOKENS, MAX_OUTPUT_TOKENS, DOC_TEXT_LIMIT, SIGNATURE_CONFIDENCE_THRESHOLD, OUTPUT_DIR,
+    PAGE_WORKERS
 )
 from .models import (
     SignatureResult, SignatureStatus, KeyValuePair, TableData,
@@ -29,82 +33,220 @@ from .models import (
 )
 
 
+# Morphology kernels for ruling-line detection in the table fallback
+_HORIZONTAL_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
+_VERTICAL_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
+
+# Key-value pairs such as "Invoice Number: 12345". Keys use a literal space
+# rather than \s so a key can't swallow the preceding line.
+_KV_RE = re.compile(r'([A-Za-z][A-Za-z ]{2,30}):\s*([^\n:]{1,100})')
+
+
+# Document type keywords, in priority order
+_DOCUMENT_TYPE_KEYWORDS = {
+    "invoice": ['invoice', 'bill to', 'amount due', 'total due'],
+    "contract": ['contract', 'agreement', 'hereby agree', 'terms and conditions'],
+    "receipt": ['receipt', 'paid', 'transaction'],
+    "resume": ['resume', 'curriculum vitae', 'work experience', 'education'],
+    "form": ['form', 'application', 'please fill'],
+}
+# Keyword -> priority rank (index into _DOCUMENT_TYPE_KEYWORDS)
+_DOCUMENT_TYPES = list(_DOCUMENT_TYPE_KEYWORDS)
+_DOCUMENT_TYPE_RANK_BY_KEYWORD = {
+    word: rank for rank, words in enumerate(_DOCUMENT_TYPE_KEYWORDS.values()) for word in words
+}
+_DOCUMENT_TYPE_RE = re.compile(
+    r'\b(' + '|'.join(map(re.escape, _DOCUMENT_TYPE_RANK_BY_KEYWORD)) + r')\b',
+    re.IGNORECASE
+)
+# Classification only needs the head of the document
+DOC_TYPE_SCAN_CHARS = 4096
+
+
 # =============================================================================
 # EASYOCR SETUP (Lazy initialization - M1 compatible)
 # =============================================================================
 
 _ocr_reader = None
+_ocr_reader_lock = threading.Lock()
 
 
 def get_ocr_reader():
     """Lazy initialization of EasyOCR with MPS support for M1."""
     global _ocr_reader
     if _ocr_reader is None:
-        import easyocr
-        _ocr_reader = easyocr.Reader(
-            ['en'],
-            gpu=True,  # Uses MPS on M1 Macs
-            verbose=False
-        )
+        # Pages are processed in parallel threads; build the reader only once
+        with _ocr_reader_lock:
+            if _ocr_reader is None:
+                import easyocr
+                _ocr_reader = easyocr.Reader(
+                    ['en'],
+                    gpu=True,  # Uses MPS on M1 Macs
+                    verbose=False
+                )
     return _ocr_reader
 
 
+def _gpu_cleanup():
+    """
+    Release memory held after a torch-backed phase (EasyOCR, Docling).
+
+    Collects garbage first so dropped tensors are actually freed, then
+    returns torch's cached blocks to the device (CUDA or Apple MPS).
+    """
+    gc.collect()
+    try:
+        import torch
+    except ImportError:
+        return
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    elif torch.backends.mps.is_available():
+        torch.mps.empty_cache()
+
+
+_img2table_ocr_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_img2table_ocr():
+    """img2table's EasyOCR wrapper builds its own Reader; construct it once."""
+    from img2table.ocr import EasyOCR as Img2TableOCR
+    return Img2TableOCR(lang=['en'])
+
+
+@functools.lru_cache(maxsize=1)
+def _get_docling_converter():
+    """Docling loads its layout/table models on construction; reuse one converter."""
+    from docling.document_converter import DocumentConverter
+    return DocumentConverter()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_pymupdf():
+    """PyMuPDF, imported on first use rather than at module load."""
+    import pymupdf
+    return pymupdf
+
+
+@functools.lru_cache(maxsize=1)
+def _get_pymupdf4llm():
+    """pymupdf4llm, imported on first use rather than at module load."""
+    import pymupdf4llm
+    return pymupdf4llm
+
+
+@functools.lru_cache(maxsize=1)
+def _get_vision_llm() -> ChatOllama:
+    """Shared vision model client."""
+    return ChatOllama(
+        model=VISION_MODEL,
+        base_url=OLLAMA_BASE_URL,
+        temperature=0,
+        # Size the KV cache to the prompt instead of the model default
+        num_ctx=MAX_TOKENS,
+        num_predict=MAX_OUTPUT_TOKENS
+    )
+
+
 # =============================================================================
 # SIGNATURE DETECTION (OpenCV)
 # =============================================================================
 
-def detect_signatures(image_path: str, threshold: float = SIGNATURE_CONFIDENCE_THRESHOLD) -> Dict:
+# Run the threshold chain on an OpenCL device (GPU) when one is available
+_USE_OPENCL = cv2.ocl.haveOpenCL()
+
+
+def _binarize_ink(region: np.ndarray) -> np.ndarray:
+    """Grayscale + adaptive threshold to find ink marks, on OpenCL if available."""
+    src = cv2.UMat(region) if _USE_OPENCL else region
+    gray = cv2.cvtColor(src, cv2.COLOR_BGR2GRAY)
+    binary = cv2.adaptiveThreshold(
+        gray, 255,
+        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY_INV, 11, 2
+    )
+    # findContours and the NumPy stages below need a regular Mat
+    return binary.get() if _USE_OPENCL else binary
+
+
+# Pages taller than this are decoded at half resolution for signature detection
+SIGNATURE_MAX_PAGE_HEIGHT = 2000
+
+
+def detect_signatures(
+    image: Union[str, np.ndarray],
+    threshold: float = SIGNATURE_CONFIDENCE_THRESHOLD
+) -> Dict:
     """
-    Detect signatures in an image using OpenCV.
+    Detect signatures in an image (path or BGR array) using OpenCV.
     Looks for ink-like marks in typical signature regions.
     """
     signatures = []
     review_items = []
 
     try:
-        img = cv2.imread(image_path)
-        if img is None:
-            return {"signatures": [], "count": 0, "valid_count": 0, "human_review_items": []}
-
-        height, width = img.shape[:2]
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-        # Focus on bottom third (common signature location)
-        signature_region = gray[int(height * 0.6):, :]
-
-        # Adaptive threshold to find ink marks
-        binary = cv2.adaptiveThreshold(
-            signature_region, 255,
-            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY_INV, 11, 2
-        )
+        # Focus on the bottom 40% of the page (common signature location).
+        # Tall pages are worked on at half resolution; signatures survive
+        # ~150 DPI. height, width and y_offset are in working-scale pixels.
+        if isinstance(image, np.ndarray):
+            scale = 2 if image.shape[0] > SIGNATURE_MAX_PAGE_HEIGHT else 1
+            crop = int(image.shape[0] * 0.6)
+            # Crop before resizing so the top of the page is never resampled
+            band = image[crop:]
+            if scale == 2:
+                band = cv2.resize(band, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+            height, width = image.shape[0] / scale, image.shape[1] / scale
+            y_offset = crop / scale
+        else:
+            with Image.open(image) as page:
+                scale = 2 if page.height > SIGNATURE_MAX_PAGE_HEIGHT else 1
+            buf = np.fromfile(image, dtype=np.uint8)
+            img = cv2.imdecode(buf, cv2.IMREAD_REDUCED_COLOR_2 if scale == 2 else cv2.IMREAD_COLOR)
+            if img is None:
+                return {"signatures": [], "count": 0, "valid_count": 0, "human_review_items": []}
+            height, width = img.shape[:2]
+            y_offset = int(height * 0.6)
+            band = img[y_offset:]
+
+        # Locations are reported relative to page size, so only the pixel
+        # thresholds below need to follow the working scale
+        binary = _binarize_ink(band)
 
         # Find contours
         contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
-        potential_signatures = []
+        # Batch bbox/area extraction into arrays and filter all contours at once
+        areas = np.fromiter((cv2.contourArea(c) for c in contours), dtype=np.float64, count=len(contours))
+        bboxes = np.asarray([cv2.boundingRect(c) for c in contours], dtype=np.int32).reshape(-1, 4)
+        xs, ys, ws, hs = bboxes.T
+        aspect_ratios = ws / np.maximum(hs, 1)
 
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area < 500 or area > 50000:
-                continue
-
-            x, y, w, h = cv2.boundingRect(contour)
-            aspect_ratio = w / h if h > 0 else 0
+        mask = (
+            (areas >= 500 / scale ** 2) & (areas <= 50000 / scale ** 2) &
+            (aspect_ratios > 1.5) & (aspect_ratios < 10) & (ws > 50 / scale)
+        )
+        xs, ys, ws, hs = xs[mask], ys[mask], ws[mask], hs[mask]
 
-            if 1.5 < aspect_ratio < 10 and w > 50:
-                roi = binary[y:y+h, x:x+w]
-                ink_density = np.sum(roi > 0) / (w * h) if w * h > 0 else 0
+        # Ink density for every candidate from one summed-area table
+        integral = cv2.integral((binary > 0).astype(np.uint8))
+        ink = (
+            integral[ys + hs, xs + ws] - integral[ys, xs + ws]
+            - integral[ys + hs, xs] + integral[ys, xs]
+        )
+        ink_density = ink / (ws * hs)
 
-                if 0.05 < ink_density < 0.5:
-                    confidence = min(0.9, ink_density * 2 + 0.3)
-                    potential_signatures.append({
-                        "bbox": (x, y + int(height * 0.6), w, h),
-                        "confidence": round(confidence, 3),
-                        "ink_density": round(ink_density, 3)
-                    })
+        keep = (ink_density > 0.05) & (ink_density < 0.5)
+        xs, ys, ws, hs, ink_density = xs[keep], ys[keep], ws[keep], hs[keep], ink_density[keep]
+        confidences = np.round(np.minimum(0.9, ink_density * 2 + 0.3), 3)
 
-        potential_signatures.sort(key=lambda s: s["confidence"], reverse=True)
+        potential_signatures = [
+            {
+                "bbox": (int(xs[j]), int(ys[j] + y_offset), int(ws[j]), int(hs[j])),
+                "confidence": float(confidences[j])
+            }
+            for j in np.argsort(-confidences, kind="stable")
+        ]
 
         for i, sig in enumerate(potential_signatures[:3]):
             x, y, w, h = sig["bbox"]
@@ -153,11 +295,39 @@ def detect_signatures(image_path: str, threshold: float = SIGNATURE_CONFIDENCE_T
 # OCR WITH EASYOCR
 # =============================================================================
 
-def extract_with_easyocr(image_path: str) -> Dict:
-    """Extract text using EasyOCR (M1 compatible with MPS support)."""
+def extract_with_easyocr(image: Union[str, np.ndarray]) -> Dict:
+    """Extract text using EasyOCR (M1 compatible with MPS support).
+
+    Accepts an image path or an RGB/BGR NumPy array.
+    """
+    reader = get_ocr_reader()
+    return _format_ocr_result(reader.readtext(image))
+
+
+def extract_with_easyocr_batch(images: List[np.ndarray], batch_size: int = 8) -> List[Dict]:
+    """Extract text from several page arrays with batched EasyOCR inference."""
     reader = get_ocr_reader()
-    result = reader.readtext(image_path)
 
+    # readtext_batched needs equally sized inputs, so batch pages by shape
+    indices_by_shape: Dict[tuple, List[int]] = {}
+    for i, img in enumerate(images):
+        indices_by_shape.setdefault(img.shape, []).append(i)
+
+    # The CRAFT detector stacks every image it is given into one tensor, so
+    # cap each call at batch_size pages to bound detector memory as well
+    detections: List[Any] = [None] * len(images)
+    for indices in indices_by_shape.values():
+        for start in range(0, len(indices), batch_size):
+            chunk = indices[start:start + batch_size]
+            batch = reader.readtext_batched([images[i] for i in chunk], batch_size=batch_size)
+            for i, result in zip(chunk, batch):
+                detections[i] = result
+
+    return [_format_ocr_result(result) for result in detections]
+
+
+def _format_ocr_result(result: List) -> Dict:
+    """Turn raw EasyOCR detections into text, lines, key-values and blocks."""
     lines = []
     all_text_blocks = []
 
@@ -173,13 +343,11 @@ def extract_with_easyocr(image_path: str) -> Dict:
     # Simple key-value extraction
     key_values = []
     full_text = ' '.join(lines)
-    kv_pattern = r'([A-Za-z][A-Za-z\s]{2,30}):\s*([^\n:]{1,100})'
-    matches = re.findall(kv_pattern, full_text)
 
-    for key, value in matches:
+    for match in _KV_RE.finditer(full_text):
         key_values.append(KeyValuePair(
-            key=key.strip(),
-            value=value.strip(),
+            key=match.group(1).strip(),
+            value=match.group(2).strip(),
             confidence=0.8
         ))
 
@@ -191,16 +359,19 @@ def extract_with_easyocr(image_path: str) -> Dict:
     }
 
 
-def extract_tables_with_img2table(image_path: str) -> List[TableData]:
-    """Extract tables using img2table."""
+def extract_tables_with_img2table(image: Union[str, np.ndarray]) -> List[TableData]:
+    """Extract tables using img2table from an image path or BGR array."""
     tables = []
 
     try:
         from img2table.document import Image as Img2TableImage
-        from img2table.ocr import EasyOCR as Img2TableOCR
 
-        ocr = Img2TableOCR(lang=['en'])
-        doc = Img2TableImage(src=image_path)
+        # Pages run in parallel threads; only one should build the OCR model
+        with _img2table_ocr_lock:
+            ocr = _get_img2table_ocr()
+        # img2table decodes from bytes; BMP skips the PNG compression pass
+        src = cv2.imencode('.bmp', image)[1].tobytes() if isinstance(image, np.ndarray) else image
+        doc = Img2TableImage(src=src)
         extracted_tables = doc.extract_tables(ocr=ocr)
 
         for idx, table in enumerate(extracted_tables):
@@ -214,27 +385,24 @@ def extract_tables_with_img2table(image_path: str) -> List[TableData]:
 
     except Exception as e:
         print(f"img2table extraction error: {e}")
-        tables = extract_tables_opencv_fallback(image_path)
+        tables = extract_tables_opencv_fallback(image)
 
     return tables
 
 
-def extract_tables_opencv_fallback(image_path: str) -> List[TableData]:
+def extract_tables_opencv_fallback(image: Union[str, np.ndarray]) -> List[TableData]:
     """Fallback table detection using OpenCV."""
     tables = []
 
     try:
-        img = cv2.imread(image_path)
+        img = image if isinstance(image, np.ndarray) else cv2.imread(image)
         if img is None:
             return tables
 
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
 
-        horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-        vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
-
-        horizontal_lines = cv2.morphologyEx(gray, cv2.MORPH_OPEN, horizontal_kernel)
-        vertical_lines = cv2.morphologyEx(gray, cv2.MORPH_OPEN, vertical_kernel)
+        horizontal_lines = cv2.morphologyEx(gray, cv2.MORPH_OPEN, _HORIZONTAL_KERNEL)
+        vertical_lines = cv2.morphologyEx(gray, cv2.MORPH_OPEN, _VERTICAL_KERNEL)
 
         table_mask = cv2.addWeighted(horizontal_lines, 0.5, vertical_lines, 0.5, 0)
         _, table_mask = cv2.threshold(table_mask, 128, 255, cv2.THRESH_BINARY)
@@ -249,10 +417,7 @@ def extract_tables_opencv_fallback(image_path: str) -> List[TableData]:
                 x, y, w, h = cv2.boundingRect(contour)
                 if w > 30 and h > 15:
                     cell_img = img[y:y+h, x:x+w]
-                    temp_cell = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-                    cv2.imwrite(temp_cell.name, cell_img)
-                    result = reader.readtext(temp_cell.name)
-                    os.unlink(temp_cell.name)
+                    result = reader.readtext(cell_img)
                     cell_text = ' '.join([det[1] for det in result]) if result else ''
                     cells.append({'x': x, 'y': y, 'w': w, 'h': h, 'text': cell_text})
 
@@ -290,95 +455,168 @@ def extract_tables_opencv_fallback(image_path: str) -> List[TableData]:
 # DOCUMENT LOADING
 # =============================================================================
 
+def rasterize_pdf(file_path: Path, dpi: int, max_pages: int) -> Iterator[Any]:
+    """Render up to max_pages PDF pages in-process with PyMuPDF, yielding pixmaps."""
+    with _get_pymupdf().open(str(file_path)) as doc:
+        for i in range(min(max_pages, doc.page_count)):
+            yield doc.load_page(i).get_pixmap(dpi=dpi)
+
+
+def pdf_page_count(file_path: Path) -> int:
+    """Number of pages in a PDF, read from the page tree without rendering."""
+    with _get_pymupdf().open(str(file_path)) as doc:
+        return doc.page_count
+
+
+# JPEG quality for page images sent to the vision model
+VISION_JPEG_QUALITY = 85
+
+
+def _encode_jpeg(image: np.ndarray) -> bytes:
+    """Encode a BGR page array as JPEG with OpenCV's libjpeg-turbo."""
+    ok, buf = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, VISION_JPEG_QUALITY])
+    if not ok:
+        raise ValueError("JPEG encoding failed")
+    return buf.tobytes()
+
+
+def _pixmap_to_array(pix) -> np.ndarray:
+    """View a PyMuPDF pixmap as an (h, w, channels) uint8 array."""
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.h, pix.w, pix.n)
+
+
 def load_with_docling(file_path: Path) -> str:
     """Load document using Docling (97.9% table accuracy)."""
     try:
-        from docling.document_converter import DocumentConverter
-        converter = DocumentConverter()
+        converter = _get_docling_converter()
         result = converter.convert(str(file_path))
         return result.document.export_to_markdown()
     except Exception as e:
         return f"Error: {str(e)}"
+    finally:
+        _gpu_cleanup()
 
 
 def load_with_pymupdf(file_path: Path) -> str:
     """Fast fallback using pymupdf4llm."""
     try:
-        import pymupdf4llm
-        return pymupdf4llm.to_markdown(str(file_path))
+        return _get_pymupdf4llm().to_markdown(str(file_path))
     except Exception as e:
         return f"Error: {str(e)}"
 
 
 def load_with_ocr(file_path: Path) -> tuple[str, List[str]]:
     """Load using EasyOCR for scanned documents."""
+    if file_path.suffix.lower() == '.pdf':
+        # Pages go to EasyOCR as arrays, in batches, never through a PNG file
+        try:
+            pages = [_pixmap_to_array(pix) for pix in rasterize_pdf(file_path, dpi=200, max_pages=20)]
+        except Exception as e:
+            return f"Error: {str(e)}", []
+        return ocr_page_images(pages)
+
     try:
-        suffix = file_path.suffix.lower()
-        all_text = []
-        text_by_page = []
+        result = extract_with_easyocr(str(file_path))
+        return result['text'], _cap_pages([result['text']])
+    except Exception as e:
+        return f"Error: {str(e)}", []
+    finally:
+        _gpu_cleanup()
 
-        if suffix == '.pdf':
-            from pdf2image import convert_from_path
-            images = convert_from_path(str(file_path), dpi=200)
-
-            for i, img in enumerate(images[:20], 1):
-                temp_path = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-                img.save(temp_path.name)
-                result = extract_with_easyocr(temp_path.name)
-                page_text = result['text']
-                all_text.append(f"--- Page {i} ---\n{page_text}")
-                text_by_page.append(page_text)
-                os.unlink(temp_path.name)
-        else:
-            result = extract_with_easyocr(str(file_path))
-            all_text.append(result['text'])
-            text_by_page.append(result['text'])
 
-        return '\n\n'.join(all_text), text_by_page
+def _join_pages(page_texts: Iterable[str]) -> str:
+    """
+    Join page texts under "--- Page N ---" headers.
+
+    Writing stops once DOC_TEXT_LIMIT characters are buffered, since
+    process_document discards everything past that point anyway.
+    """
+    buf = io.StringIO()
+    for i, page_text in enumerate(page_texts, 1):
+        if buf.tell() >= DOC_TEXT_LIMIT:
+            break
+        if i > 1:
+            buf.write("\n\n")
+        buf.write(f"--- Page {i} ---\n")
+        buf.write(page_text)
+    return buf.getvalue()
+
+
+def _cap_pages(page_texts: Iterable[str]) -> List[str]:
+    """
+    Keep per-page text within the same DOC_TEXT_LIMIT budget as the joined text.
 
+    Pages past the budget are dropped and the last kept page is truncated, so
+    text_by_page never holds more OCR output than the document text it mirrors.
+    """
+    capped = []
+    remaining = DOC_TEXT_LIMIT
+    for page_text in page_texts:
+        if remaining <= 0:
+            break
+        capped.append(page_text[:remaining])
+        remaining -= len(page_text)
+    return capped
+
+
+def ocr_page_images(images: List[np.ndarray]) -> tuple[str, List[str]]:
+    """OCR already rendered PDF pages, returning the joined text and text per page."""
+    try:
+        text_by_page = _cap_pages(result['text'] for result in extract_with_easyocr_batch(images))
+        return _join_pages(text_by_page), text_by_page
     except Exception as e:
         return f"Error: {str(e)}", []
+    finally:
+        _gpu_cleanup()
 
 
 def load_with_vision(file_path: Path) -> str:
     """Load using LLaVA vision model."""
-    try:
-        from pdf2image import convert_from_path
-        import io
-
-        suffix = file_path.suffix.lower()
-        images_b64 = []
+    suffix = file_path.suffix.lower()
+    jpeg_pages = []
 
+    try:
         if suffix == '.pdf':
-            images = convert_from_path(str(file_path), dpi=150)
-            for img in images[:5]:
-                buffer = io.BytesIO()
-                img.save(buffer, format='JPEG', quality=85)
-                images_b64.append(base64.b64encode(buffer.getvalue()).decode())
-        elif suffix in ['.jpg', '.jpeg', '.png', '.tiff', '.bmp']:
-            with open(file_path, 'rb') as f:
-                images_b64.append(base64.b64encode(f.read()).decode())
+            # MuPDF encodes the JPEG directly from the rendered pixmap, no PIL round-trip
+            for pix in rasterize_pdf(file_path, dpi=150, max_pages=5):
+                jpeg_pages.append(pix.tobytes("jpeg", jpg_quality=VISION_JPEG_QUALITY))
+        elif suffix in ['.jpg', '.jpeg']:
+            # Already JPEG: send the file bytes as-is
+            jpeg_pages.append(file_path.read_bytes())
+        elif suffix in ['.png', '.tiff', '.bmp']:
+            # Transcode to JPEG to shrink the upload to Ollama
+            buf = np.frombuffer(file_path.read_bytes(), dtype=np.uint8)
+            img = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+            if img is None:
+                return f"Error: Could not decode {file_path.name}"
+            jpeg_pages.append(_encode_jpeg(img))
         else:
             return f"Vision not supported for {suffix}"
+    except Exception as e:
+        return f"Error: {str(e)}"
 
-        llm = ChatOllama(
-            model=VISION_MODEL,
-            base_url=OLLAMA_BASE_URL,
-            temperature=0
-        )
+    return vision_page_images(jpeg_pages)
+
+
+def vision_page_images(jpeg_pages: List[bytes]) -> str:
+    """Transcribe JPEG-encoded pages with the vision model."""
+    try:
+        images_b64 = [base64.b64encode(page).decode('ascii') for page in jpeg_pages]
+        llm = _get_vision_llm()
 
-        all_text = []
-        for i, img_b64 in enumerate(images_b64, 1):
-            message = HumanMessage(
+        # Submit all pages together so Ollama can serve them in parallel slots
+        batch = [
+            [HumanMessage(
                 content=[
                     {"type": "text", "text": "Extract all text, tables, and structured information from this document. Format as markdown."},
                     {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{img_b64}"}}
                 ]
-            )
-            response = llm.invoke([message])
-            all_text.append(f"--- Page {i} ---\n{response.content}")
+            )]
+            for img_b64 in images_b64
+        ]
+        responses = llm.batch(batch, config={"max_concurrency": OLLAMA_NUM_PARALLEL})
 
-        return '\n\n'.join(all_text)
+        return _join_pages(response.content for response in responses)
 
     except Exception as e:
         return f"Error: {str(e)}"
@@ -391,8 +629,36 @@ def load_with_vision(file_path: Path) -> str:
 class DocumentProcessor:
     """Main document processing engine."""
 
-    def __init__(self):
+    def __init__(self, max_workers: int = PAGE_WORKERS):
         self.output_dir = OUTPUT_DIR
+        self.max_workers = max_workers
+        # Shared across documents, created lazily per process: an executor
+        # doesn't survive fork, so a child must never reuse its parent's
+        self._page_executor: Optional[ThreadPoolExecutor] = None
+        self._page_executor_pid: Optional[int] = None
+        self._page_executor_lock = threading.Lock()
+
+    @property
+    def page_executor(self) -> ThreadPoolExecutor:
+        """Thread pool for per-page analysis, owned by the current process."""
+        pid = os.getpid()
+        if self._page_executor_pid != pid:
+            with self._page_executor_lock:
+                if self._page_executor_pid != pid:
+                    self._page_executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="page"
+                    )
+                    self._page_executor_pid = pid
+        return self._page_executor
+
+    def warmup(self):
+        """Import the PDF libraries and load the EasyOCR models up front instead of inside the first job."""
+        for factory in (_get_pymupdf, _get_pymupdf4llm, get_ocr_reader):
+            try:
+                factory()
+            except Exception as e:
+                print(f"Warmup error in {factory.__name__}: {e}")
 
     def process_document(
         self,
@@ -442,6 +708,25 @@ class DocumentProcessor:
 
         update_progress(10, "Loading document")
 
+        # Render PDF pages once and share them between OCR/vision text
+        # extraction and the per-page analysis below. Pages stay in memory as
+        # BGR arrays (OpenCV channel order); plain vision or signature runs
+        # don't need OCR/table-grade resolution. Text-only runs with the
+        # docling/pymupdf loaders skip rendering altogether.
+        images = []
+        needs_pages = method in ("ocr", "vision") or extract_tables or extract_signatures
+        if is_pdf and needs_pages:
+            dpi = 200 if (method == "ocr" or extract_tables) else 150
+            for pix in rasterize_pdf(file_path, dpi=dpi, max_pages=20):
+                images.append(cv2.cvtColor(_pixmap_to_array(pix), cv2.COLOR_RGB2BGR))
+        elif is_image:
+            images.append(str(file_path))
+
+        if is_pdf:
+            page_count = pdf_page_count(file_path)
+        else:
+            page_count = len(images) if images else 1
+
         # Extract text
         text = ""
         text_by_page = []
@@ -453,73 +738,67 @@ class DocumentProcessor:
         elif method == "pymupdf":
             text = load_with_pymupdf(file_path)
         elif method == "ocr":
-            text, text_by_page = load_with_ocr(file_path)
+            if is_pdf:
+                text, text_by_page = ocr_page_images(images)
+            else:
+                text, text_by_page = load_with_ocr(file_path)
         elif method == "vision":
-            text = load_with_vision(file_path)
+            if is_pdf:
+                text = vision_page_images([_encode_jpeg(img) for img in images[:5]])
+            else:
+                text = load_with_vision(file_path)
 
-        update_progress(40, "Text extracted")
+        # Only the first DOC_TEXT_LIMIT characters are kept, so don't scan past them
+        text = text[:DOC_TEXT_LIMIT]
 
-        # Convert to images for further processing
-        images = []
-        if is_pdf:
-            from pdf2image import convert_from_path
-            pil_images = convert_from_path(str(file_path), dpi=200)
-            for img in pil_images[:20]:
-                temp_path = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-                img.save(temp_path.name)
-                images.append(temp_path.name)
-        elif is_image:
-            images.append(str(file_path))
+        update_progress(40, "Text extracted")
 
-        # Extract tables
+        # Extract tables and detect signatures, pages in parallel. OpenCV and
+        # EasyOCR's torch backend release the GIL in their native calls.
         all_tables = []
-        if extract_tables and images:
-            update_progress(50, "Extracting tables")
-            for page_num, img_path in enumerate(images, 1):
-                tables = extract_tables_with_img2table(img_path)
-                for t in tables:
-                    t.page = page_num
-                all_tables.extend(tables)
-
-        update_progress(65, "Tables extracted")
-
-        # Detect signatures
         all_signatures = []
         review_items = []
-        if extract_signatures and images:
-            update_progress(70, "Detecting signatures")
-            for page_num, img_path in enumerate(images, 1):
-                sig_result = detect_signatures(img_path)
-                for sig in sig_result['signatures']:
-                    sig.page = page_num
-                all_signatures.extend(sig_result['signatures'])
-                review_items.extend(sig_result['human_review_items'])
+        if (extract_tables or extract_signatures) and images:
+            update_progress(50, "Analyzing pages")
+            progress_lock = threading.Lock()
+            pages_done = 0
+
+            def process_page(page):
+                nonlocal pages_done
+                page_result = self._process_page(*page, extract_tables, extract_signatures)
+                with progress_lock:
+                    pages_done += 1
+                    update_progress(
+                        50 + 30 * pages_done // len(images),
+                        f"Analyzed page {pages_done}/{len(images)}"
+                    )
+                return page_result
+
+            try:
+                page_results = list(self.page_executor.map(process_page, enumerate(images, 1)))
+            finally:
+                # Table extraction runs EasyOCR on the pages
+                if extract_tables:
+                    _gpu_cleanup()
+
+            for tables, signatures, items in page_results:
+                all_tables.extend(tables)
+                all_signatures.extend(signatures)
+                review_items.extend(items)
 
-        update_progress(80, "Signatures detected")
+        update_progress(80, "Pages analyzed")
 
         # Extract key-values
         all_key_values = []
         if extract_key_values:
             update_progress(85, "Extracting key-value pairs")
-            kv_pattern = r'([A-Za-z][A-Za-z\s]{2,30}):\s*([^\n:]{1,100})'
-            matches = re.findall(kv_pattern, text)
-            for key, value in matches:
-                all_key_values.append(KeyValuePair(
-                    key=key.strip(),
-                    value=value.strip(),
-                    confidence=0.8
-                ))
+            all_key_values = [
+                KeyValuePair(key=m.group(1).strip(), value=m.group(2).strip(), confidence=0.8)
+                for m in _KV_RE.finditer(text)
+            ]
 
         update_progress(90, "Key-values extracted")
 
-        # Cleanup temp files
-        if is_pdf:
-            for img_path in images:
-                try:
-                    os.unlink(img_path)
-                except:
-                    pass
-
         # Calculate confidence
         confidence_scores = []
         if all_signatures:
@@ -534,10 +813,10 @@ class DocumentProcessor:
         result = ExtractionResult(
             document_source=str(file_path),
             document_type=self._detect_document_type(text),
-            pages=len(images) if images else 1,
+            pages=page_count,
             processed_at=datetime.now().isoformat(),
             processing_time_seconds=round(processing_time, 2),
-            text=text[:DOC_TEXT_LIMIT] if len(text) > DOC_TEXT_LIMIT else text,
+            text=text,
             text_by_page=text_by_page if text_by_page else None,
             key_values=all_key_values,
             tables=all_tables,
@@ -552,22 +831,44 @@ class DocumentProcessor:
 
         return result
 
+    def _process_page(
+        self,
+        page_num: int,
+        image: Union[str, np.ndarray],
+        extract_tables: bool,
+        extract_signatures: bool
+    ) -> tuple[List[TableData], List[SignatureResult], List[HumanReviewItem]]:
+        """Extract tables and signatures from a single page image."""
+        tables = []
+        signatures = []
+        review_items = []
+
+        if extract_tables:
+            tables = extract_tables_with_img2table(image)
+            for t in tables:
+                t.page = page_num
+
+        if extract_signatures:
+            sig_result = detect_signatures(image)
+            signatures = sig_result['signatures']
+            for sig in signatures:
+                sig.page = page_num
+            review_items = sig_result['human_review_items']
+
+        return tables, signatures, review_items
+
     def _detect_document_type(self, text: str) -> Optional[str]:
         """Detect document type from content."""
-        text_lower = text.lower()
-
-        if any(word in text_lower for word in ['invoice', 'bill to', 'amount due', 'total due']):
-            return "invoice"
-        elif any(word in text_lower for word in ['contract', 'agreement', 'hereby agree', 'terms and conditions']):
-            return "contract"
-        elif any(word in text_lower for word in ['receipt', 'paid', 'transaction']):
-            return "receipt"
-        elif any(word in text_lower for word in ['resume', 'curriculum vitae', 'work experience', 'education']):
-            return "resume"
-        elif any(word in text_lower for word in ['form', 'application', 'please fill']):
-            return "form"
-        else:
-            return None
+        # One case-insensitive pass over the head keeping the best-ranked
+        # match; stop early once the top-priority type has been seen.
+        best = None
+        for m in _DOCUMENT_TYPE_RE.finditer(text, 0, DOC_TYPE_SCAN_CHARS):
+            rank = _DOCUMENT_TYPE_RANK_BY_KEYWORD[m.group(1).lower()]
+            if best is None or rank < best:
+                best = rank
+                if best == 0:
+                    break
+        return _DOCUMENT_TYPES[best] if best is not None else None
 
     def save_result(self, result: ExtractionResult, output_path: Optional[str] = None) -> str:
         """Save extraction result to JSON file."""
@@ -580,11 +881,40 @@ class DocumentProcessor:
 
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, 'w') as f:
-            json.dump(result.model_dump(), f, indent=2, default=str)
+        # Serialize straight from the model, no intermediate dict
+        output_path.write_text(result.model_dump_json(indent=2))
 
         return str(output_path)
 
+    def render_markdown(self, result: ExtractionResult) -> str:
+        """Render key-values, tables and signatures as a Markdown document."""
+        source_name = Path(result.document_source).stem
+
+        parts = [
+            f"# Extraction Result: {source_name}\n\n",
+            f"**Processed:** {result.processed_at}\n\n",
+            "## Key-Value Pairs\n\n"
+        ]
+        parts.extend(f"- **{kv.key}:** {kv.value}\n" for kv in result.key_values)
+
+        parts.append("\n## Tables\n\n")
+        for table in result.tables:
+            parts.append(f"### {table.id}\n\n")
+            if table.rows:
+                headers = table.rows[0]
+                parts.append("| " + " | ".join(headers) + " |\n")
+                parts.append("| " + " | ".join(["---"] * len(headers)) + " |\n")
+                parts.extend("| " + " | ".join(row) + " |\n" for row in table.rows[1:])
+            parts.append("\n")
+
+        parts.append("## Signatures\n\n")
+        parts.extend(
+            f"- {sig.id}: {sig.status.value} (confidence: {sig.confidence})\n"
+            for sig in result.signatures
+        )
+
+        return "".join(parts)
+
     def export_to_csv(self, result: ExtractionResult, output_path: str) -> str:
         """Export key-values and tables to CSV."""
         import csv
@@ -598,84 +928,111 @@ class DocumentProcessor:
             # Key-values section
             writer.writerow(['KEY-VALUE PAIRS'])
             writer.writerow(['Key', 'Value', 'Confidence'])
-            for kv in result.key_values:
-                writer.writerow([kv.key, kv.value, kv.confidence])
+            writer.writerows([kv.key, kv.value, kv.confidence] for kv in result.key_values)
 
             writer.writerow([])
 
             # Tables section
             for table in result.tables:
                 writer.writerow([f'TABLE: {table.id}'])
-                for row in table.rows:
-                    writer.writerow(row)
+                writer.writerows(table.rows)
                 writer.writerow([])
 
             # Signatures section
             writer.writerow(['SIGNATURES'])
             writer.writerow(['ID', 'Status', 'Confidence', 'Page'])
-            for sig in result.signatures:
-                writer.writerow([sig.id, sig.status.value, sig.confidence, sig.page])
+            writer.writerows(
+                [sig.id, sig.status.value, sig.confidence, sig.page] for sig in result.signatures
+            )
 
         return str(output_path)
 
     def export_to_excel(self, result: ExtractionResult, output_path: str) -> str:
         """Export to Excel with multiple sheets."""
         try:
-            import openpyxl
-            from openpyxl import Workbook
+            import xlsxwriter
+        except ImportError:
+            raise ImportError("xlsxwriter is required for Excel export. Install with: pip install xlsxwriter")
 
-            wb = Workbook()
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
 
+        # constant_memory streams each row to disk instead of holding the
+        # workbook in memory; rows must therefore be written top to bottom.
+        with xlsxwriter.Workbook(str(output_path), {'constant_memory': True}) as wb:
             # Key-values sheet
-            ws_kv = wb.active
-            ws_kv.title = "Key-Value Pairs"
-            ws_kv.append(['Key', 'Value', 'Confidence', 'Page'])
-            for kv in result.key_values:
-                ws_kv.append([kv.key, kv.value, kv.confidence, kv.page])
+            ws_kv = wb.add_worksheet("Key-Value Pairs")
+            ws_kv.write_row(0, 0, ['Key', 'Value', 'Confidence', 'Page'])
+            for row_num, kv in enumerate(result.key_values, 1):
+                ws_kv.write_row(row_num, 0, [kv.key, kv.value, kv.confidence, kv.page])
 
             # Tables sheet
-            ws_tables = wb.create_sheet("Tables")
-            row_num = 1
+            ws_tables = wb.add_worksheet("Tables")
+            row_num = 0
             for table in result.tables:
-                ws_tables.cell(row=row_num, column=1, value=f"Table: {table.id} (Page {table.page})")
+                ws_tables.write(row_num, 0, f"Table: {table.id} (Page {table.page})")
                 row_num += 1
                 for row in table.rows:
-                    for col_num, cell_value in enumerate(row, 1):
-                        ws_tables.cell(row=row_num, column=col_num, value=cell_value)
+                    ws_tables.write_row(row_num, 0, row)
                     row_num += 1
                 row_num += 1
 
             # Signatures sheet
-            ws_sig = wb.create_sheet("Signatures")
-            ws_sig.append(['ID', 'Status', 'Confidence', 'Page', 'Location'])
-            for sig in result.signatures:
-                ws_sig.append([
+            ws_sig = wb.add_worksheet("Signatures")
+            ws_sig.write_row(0, 0, ['ID', 'Status', 'Confidence', 'Page', 'Location'])
+            for row_num, sig in enumerate(result.signatures, 1):
+                ws_sig.write_row(row_num, 0, [
                     sig.id, sig.status.value, sig.confidence, sig.page,
                     str(sig.location)
                 ])
 
             # Summary sheet
-            ws_summary = wb.create_sheet("Summary")
-            ws_summary.append(['Document Source', result.document_source])
-            ws_summary.append(['Document Type', result.document_type or 'Unknown'])
-            ws_summary.append(['Pages', result.pages])
-            ws_summary.append(['Processed At', result.processed_at])
-            ws_summary.append(['Processing Time (s)', result.processing_time_seconds])
-            ws_summary.append(['Key-Value Pairs', len(result.key_values)])
-            ws_summary.append(['Tables', len(result.tables)])
-            ws_summary.append(['Signatures', len(result.signatures)])
-            ws_summary.append(['Human Review Required', result.human_review_required])
-            ws_summary.append(['Overall Confidence', result.overall_confidence])
-
-            output_path = Path(output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            wb.save(output_path)
+            ws_summary = wb.add_worksheet("Summary")
+            summary_rows = [
+                ['Document Source', result.document_source],
+                ['Document Type', result.document_type or 'Unknown'],
+                ['Pages', result.pages],
+                ['Processed At', result.processed_at],
+                ['Processing Time (s)', result.processing_time_seconds],
+                ['Key-Value Pairs', len(result.key_values)],
+                ['Tables', len(result.tables)],
+                ['Signatures', len(result.signatures)],
+                ['Human Review Required', result.human_review_required],
+                ['Overall Confidence', result.overall_confidence],
+            ]
+            for row_num, row in enumerate(summary_rows):
+                ws_summary.write_row(row_num, 0, row)
 
-            return str(output_path)
-
-        except ImportError:
-            raise ImportError("openpyxl is required for Excel export. Install with: pip install openpyxl")
+        return str(output_path)
 
 
 # Global processor instance
 processor = DocumentProcessor()
+
+
+def run_processing(
+    file_path: str,
+    options: Dict[str, Any],
+    progress: Optional[Dict[str, Any]] = None,
+    job_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Process a document in a worker process.
+
+    Top-level (picklable) entry point for ProcessPoolExecutor. Callbacks can't
+    cross the process boundary, so progress is written to a shared mapping
+    keyed by job_id and the result is returned as a plain dict.
+    """
+    def progress_callback(percent: int, step: str):
+        if progress is not None:
+            progress[job_id] = (percent, step)
+
+    result = processor.process_document(
+        file_path=file_path,
+        method=options.get("method", "auto"),
+        extract_tables=options.get("extract_tables", True),
+        extract_signatures=options.get("extract_signatures", True),
+        extract_key_values=options.get("extract_key_values", True),
+        progress_callback=progress_callback
+    )
+    return result.model_dump()
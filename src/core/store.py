@@ -0,0 +1,103 @@
+"""
+DocuExtract Pro - Job and Result Storage
+Bounded in-memory job index with SQLite-backed result persistence.
+"""
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .models import ExtractionResult
+
+
+class JobStore(OrderedDict):
+    """
+    Insertion-ordered job index capped at max_size entries.
+
+    The oldest job is evicted once the cap is exceeded, so iterating in
+    reverse yields the most recent jobs first without sorting. on_evict,
+    if given, is called with (key, value) for each evicted entry.
+    """
+
+    def __init__(self, max_size: int, on_evict: Optional[Callable[[str, Any], None]] = None):
+        super().__init__()
+        self.max_size = max_size
+        self.on_evict = on_evict
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        while len(self) > self.max_size:
+            evicted_key, evicted_value = self.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(evicted_key, evicted_value)
+
+
+class ResultStore:
+    """
+    Extraction results persisted to SQLite as JSON, keyed by job_id.
+
+    The connection is shared by the event loop and worker threads, so every
+    statement runs under a lock.
+    """
+
+    def __init__(self, db_path: Path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results (job_id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def __setitem__(self, job_id: str, result: ExtractionResult):
+        data = result.model_dump_json()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (job_id, data) VALUES (?, ?)",
+                (job_id, data)
+            )
+            self._conn.commit()
+
+    def __getitem__(self, job_id: str) -> ExtractionResult:
+        result = self.get(job_id)
+        if result is None:
+            raise KeyError(job_id)
+        return result
+
+    def __contains__(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM results WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return row is not None
+
+    def __delitem__(self, job_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM results WHERE job_id = ?", (job_id,))
+            self._conn.commit()
+
+    def clear(self):
+        """Delete all stored results."""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[ExtractionResult]:
+        """Load a result by job_id, or None if it doesn't exist."""
+        data = self.get_json(job_id)
+        if data is None:
+            return None
+        return ExtractionResult.model_validate_json(data)
+
+    def get_json(self, job_id: str) -> Optional[str]:
+        """Return the stored JSON for a result without parsing it."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM results WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
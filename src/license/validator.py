@@ -3,12 +3,38 @@ DocuExtract Pro - License Validation System
 Supports offline validation with trial mode.
 """
 import os
-import json
+import re
+import copy
+import atexit
+import string
 import hashlib
+import functools
 import uuid
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+
+import orjson
+
+
+# Parsed license files keyed by path, as (st_mtime_ns, data). A file is only
+# re-read and re-parsed when it changes on disk. Entries mirror the file
+# contents; validators work on their own copies.
+_LICENSE_CACHE: Dict[Path, Tuple[int, Dict]] = {}
+
+
+@functools.lru_cache(maxsize=1)
+def _get_machine_id() -> str:
+    """Generate a unique machine identifier."""
+    import platform
+
+    components = [
+        platform.node(),
+        platform.machine(),
+        platform.processor(),
+    ]
+    raw = "-".join(components).encode()
+    return hashlib.sha256(raw).hexdigest()[:16]
 
 
 class LicenseValidator:
@@ -27,6 +53,8 @@ class LicenseValidator:
     LICENSE_FILE = Path.home() / ".docuextract" / "license.json"
     TRIAL_LIMIT = 10
     TRIAL_DAYS = 14
+    # Unlimited licenses persist their usage counter every N documents
+    USAGE_FLUSH_INTERVAL = 10
 
     LICENSE_TYPES = {
         "TRIAL": {"documents": 10, "machines": 1, "commercial": False},
@@ -35,31 +63,34 @@ class LicenseValidator:
         "BUSINESS": {"documents": -1, "machines": 5, "commercial": True},
     }
 
+    _ALPHANUM = frozenset(string.ascii_uppercase + string.digits)
+    _KEY_RE = re.compile(r'^[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}$')
+
     def __init__(self):
         self._license_data: Optional[Dict] = None
-        self._machine_id = self._get_machine_id()
+        self._dirty = 0
+        self._machine_id = _get_machine_id()
         self._load_license()
-
-    def _get_machine_id(self) -> str:
-        """Generate a unique machine identifier."""
-        import platform
-
-        components = [
-            platform.node(),
-            platform.machine(),
-            platform.processor(),
-        ]
-        raw = "-".join(components).encode()
-        return hashlib.sha256(raw).hexdigest()[:16]
+        atexit.register(self.flush)
 
     def _load_license(self):
         """Load license from file or create trial."""
-        if self.LICENSE_FILE.exists():
-            try:
-                with open(self.LICENSE_FILE, 'r') as f:
-                    self._license_data = json.load(f)
-            except:
-                self._license_data = None
+        try:
+            mtime_ns = self.LICENSE_FILE.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+
+        if mtime_ns is not None:
+            cached = _LICENSE_CACHE.get(self.LICENSE_FILE)
+            if cached and cached[0] == mtime_ns:
+                self._license_data = copy.deepcopy(cached[1])
+            else:
+                try:
+                    data = orjson.loads(self.LICENSE_FILE.read_bytes())
+                    _LICENSE_CACHE[self.LICENSE_FILE] = (mtime_ns, data)
+                    self._license_data = copy.deepcopy(data)
+                except:
+                    self._license_data = None
 
         if not self._license_data:
             self._create_trial()
@@ -67,8 +98,14 @@ class LicenseValidator:
     def _save_license(self):
         """Save license to file."""
         self.LICENSE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.LICENSE_FILE, 'w') as f:
-            json.dump(self._license_data, f, indent=2)
+        # Write a temp file and swap it in so a crash never leaves a torn license
+        tmp_path = self.LICENSE_FILE.with_name(self.LICENSE_FILE.name + ".tmp")
+        tmp_path.write_bytes(orjson.dumps(self._license_data, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_path, self.LICENSE_FILE)
+        self._dirty = 0
+        _LICENSE_CACHE[self.LICENSE_FILE] = (
+            self.LICENSE_FILE.stat().st_mtime_ns, copy.deepcopy(self._license_data)
+        )
 
     def _create_trial(self):
         """Create a new trial license."""
@@ -85,9 +122,12 @@ class LicenseValidator:
 
     def _validate_key_format(self, key: str) -> bool:
         """Validate license key format."""
-        import re
-        pattern = r'^[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}$'
-        return bool(re.match(pattern, key.upper()))
+        key = key.upper()
+        # Fixed XXXX-XXXX-XXXX-XXXX shape: check it structurally first
+        if (len(key) == 19 and key[4] == key[9] == key[14] == '-'
+                and all(c in self._ALPHANUM for c in key[:4] + key[5:9] + key[10:14] + key[15:])):
+            return True
+        return bool(self._KEY_RE.match(key))
 
     def _decode_key(self, key: str) -> Optional[Dict]:
         """
@@ -119,9 +159,8 @@ class LicenseValidator:
         # Validate checksum (simplified)
         data_part = key[:12]
         checksum = key[12:16]
-        expected_checksum = hashlib.md5(data_part.encode()).hexdigest()[:4].upper()
-
-        if checksum != expected_checksum:
+        # Keys issued before the BLAKE2b switch carry an MD5 checksum
+        if checksum != _key_checksum(data_part) and checksum != _legacy_key_checksum(data_part):
             return None
 
         # Decode expiry (in production, properly encrypted)
@@ -200,6 +239,15 @@ class LicenseValidator:
         """Record a document processing."""
         if self._license_data:
             self._license_data["documents_processed"] += 1
+            self._dirty += 1
+            # Metered licenses save every document; unlimited ones in batches
+            limit = self.LICENSE_TYPES.get(self._license_data["type"], {}).get("documents", 0)
+            if limit != -1 or self._dirty >= self.USAGE_FLUSH_INTERVAL:
+                self._save_license()
+
+    def flush(self):
+        """Save any usage not yet written to the license file."""
+        if self._dirty and self._license_data:
             self._save_license()
 
     def get_license_info(self) -> Dict[str, Any]:
@@ -256,6 +304,16 @@ class LicenseValidator:
         return {"documents": docs, "days": days}
 
 
+def _key_checksum(data_part: str) -> str:
+    """4-hex-char checksum over the first 12 key characters (BLAKE2b, 2-byte digest)."""
+    return hashlib.blake2b(data_part.encode(), digest_size=2).hexdigest().upper()
+
+
+def _legacy_key_checksum(data_part: str) -> str:
+    """Checksum used by keys issued before BLAKE2b: first 4 hex chars of MD5."""
+    return hashlib.md5(data_part.encode()).hexdigest()[:4].upper()
+
+
 def generate_license_key(license_type: str) -> str:
     """
     Generate a license key for testing.
@@ -274,7 +332,7 @@ def generate_license_key(license_type: str) -> str:
     type_code = type_codes[license_type]
     random_part = uuid.uuid4().hex[:8].upper()
     data_part = type_code + random_part
-    checksum = hashlib.md5(data_part.encode()).hexdigest()[:4].upper()
+    checksum = _key_checksum(data_part)
 
     full_key = data_part + checksum
     return f"{full_key[:4]}-{full_key[4:8]}-{full_key[8:12]}-{full_key[12:16]}"
@@ -0,0 +1,60 @@
+"""
+Regression test: a pool job must not hang after an in-process (fast path) job.
+
+Running process_document in the API process starts the page executor's
+threads there; pool workers must not inherit that executor.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pymupdf
+import pytest
+
+from src.api import main
+from src.core.processor import processor, run_processing
+
+
+def _make_pdf(path: str):
+    doc = pymupdf.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "Invoice Number: 12345")
+    page.insert_text((72, 700), "Signed: ______________________")
+    doc.save(path)
+    doc.close()
+
+
+def test_pool_job_after_fast_path_job(tmp_path):
+    pdf_path = str(tmp_path / "document.pdf")
+    _make_pdf(pdf_path)
+    options = {"method": "pymupdf", "extract_tables": False, "extract_signatures": True}
+
+    # In-process job on the processor run_processing uses, starting its page
+    # executor threads here before any pool worker exists
+    fast_result = processor.process_document(
+        pdf_path, method="pymupdf", extract_tables=False, extract_signatures=True
+    )
+
+    # Pool path: must complete instead of blocking on an inherited executor
+    future = main.CPU_POOL.submit(run_processing, pdf_path, options)
+    pool_result = future.result(timeout=120)
+
+    assert pool_result["pages"] == fast_result.pages == 1
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="fork not available"
+)
+def test_forked_worker_gets_its_own_page_executor(tmp_path):
+    pdf_path = str(tmp_path / "document.pdf")
+    _make_pdf(pdf_path)
+    options = {"method": "pymupdf", "extract_tables": False, "extract_signatures": True}
+
+    processor.process_document(
+        pdf_path, method="pymupdf", extract_tables=False, extract_signatures=True
+    )
+
+    # Any forking caller, not just CPU_POOL, must get a working executor
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as pool:
+        pool_result = pool.submit(run_processing, pdf_path, options).result(timeout=60)
+
+    assert pool_result["pages"] == 1